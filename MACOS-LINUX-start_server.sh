@@ -17,4 +17,8 @@ else
   exit 1
 fi
 
+# Hand the launcher what we already resolved so it doesn't look it up again
+export LLMBOX_PYTHON="${PYTHON_BIN}"
+export LLMBOX_REPO_ROOT="${SCRIPT_DIR}"
+
 "${PYTHON_BIN}" "${SCRIPT_DIR}/app/launcher/launch.py"
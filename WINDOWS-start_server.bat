@@ -13,6 +13,10 @@ if not exist "%PYTHON%" (
 echo Starting LLM-in-a-Box Server...
 echo.
 
+REM Hand the launcher what we already resolved so it doesn't look it up again
+set LLMBOX_PYTHON=%PYTHON%
+set LLMBOX_REPO_ROOT=%SCRIPT_DIR%
+
 REM Launch the launcher directly (shows output in this window)
 "%PYTHON%" "%SCRIPT_DIR%app\launcher\launch.py"
 
@@ -1,95 +1,275 @@
+import http.client
 import json
 import logging
 import os
 import platform
+import re
 import socket
 import subprocess
+import threading
 import time
-import urllib.error
-import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import MappingProxyType
 from urllib.parse import urlparse
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; the bundled Python does not ship it
+    orjson = None
+
 
 logger = logging.getLogger(__name__)
 
+# Also used by server.py, so both encode JSON the same way. Both variants
+# produce compact UTF-8 bytes, and decode errors are ValueErrors either way
+if orjson is not None:
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(payload):
+        # Compact like orjson, so the output doesn't depend on which is installed
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    _json_loads = json.loads
+
+# Idle keep-alive connections kept per runtime host
+HTTP_POOL_MAXSIZE = 16
+# llama-server opens its port before the weights are loaded and answers
+# /health with 503 until they are; poll quickly at first, then back off
+LLAMA_READY_POLL_INTERVAL = 0.025
+LLAMA_READY_MAX_POLL_INTERVAL = 0.5
+LLAMA_HEALTH_TIMEOUT = 2.0
+# How long shutdown waits for llama-server processes before killing them
+LLAMA_SHUTDOWN_TIMEOUT = 3.0
+# Lines of llama-server stderr kept for error reporting
+LLAMA_STDERR_TAIL_LINES = 50
+# Spawn attempts when a picked port is taken before llama-server binds it
+LLAMA_SPAWN_ATTEMPTS = 3
+
+# Host platform, detected once; platform.machine() can shell out to uname
+_SYSTEM = platform.system().lower()
+_MACHINE = platform.machine().lower()
+_IS_ARM = _MACHINE in {"arm64", "aarch64"}
+_BINARY_NAME = "llama-server.exe" if os.name == "nt" else "llama-server"
+# Release build directory patterns to try, in order of preference
+_BUILD_PATTERNS = {
+    "windows": ["*-bin-win-cpu-x64"],
+    "darwin": (
+        ["*-bin-macos-arm64", "*-bin-macos-x64"]
+        if _IS_ARM
+        else ["*-bin-macos-x64", "*-bin-macos-arm64"]
+    ),
+    "linux": ["*-bin-ubuntu-x64"],
+}
+
+# Stop sequences for models that do not configure their own
+_DEFAULT_STOP = ("</s>", "<|im_end|>", "\n\nUser:", "\n\nQuestion:")
+
+# Reasoning model scratchpad, stripped from replies
+_THINK_RE = re.compile(r'<think>.*?</think>', re.DOTALL)
+# llama-server / OS messages for a port that is already bound
+_PORT_IN_USE_RE = re.compile(
+    r"address already in use|couldn't bind|only one usage of each socket address",
+    re.IGNORECASE,
+)
+
+
+def _available_memory():
+    """Return bytes of memory that can be used without swapping, or None if unknown."""
+    # MemFree (SC_AVPHYS_PAGES) leaves out reclaimable page cache and is small
+    # on any machine that has been up a while; MemAvailable counts it
+    try:
+        with open("/proc/meminfo", "rb") as meminfo:
+            for line in meminfo:
+                if line.startswith(b"MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    # Elsewhere, only rule out models larger than physical memory
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+# Stops unloaded llama-server processes without blocking the caller
+_teardown_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="server-teardown")
+
 
 class LocalEngine:
     def __init__(self):
         self.loaded_models = set()
         self.loading_models = set()  # Track models currently being loaded
         self.model_errors = {}  # Track loading errors {model_id: error_message}
-        self.model_catalog = {}
-        self.llama_servers = {}
+        self.model_catalog = MappingProxyType({})
+        self.llama_servers = {}  # {model_id: server}; identical entries share one server
+        self._shared_servers = {}  # Ready servers by launch configuration {key: server}
         self.repo_root = Path(__file__).resolve().parents[2]
         self.allow_remote = os.environ.get("LLM_BOX_ALLOW_REMOTE", "0") == "1"
+        self._http_pool = {}  # Idle keep-alive connections {(scheme, host, port): [conn, ...]}
+        self._http_lock = threading.Lock()
+        self._server_path_cache = {}  # {model_id: (resolution inputs, Path)}
+        self._model_path_cache = {}  # {artifact: Path}
+        self._stat_cache = {}  # Existence checks made while resolving {Path: bool}
+        # Guards loaded_models, loading_models, model_errors, llama_servers and
+        # _shared_servers, which are shared between request handlers and loader threads
+        self._lock = threading.RLock()
+        # Serializes server startup per model and per launch key {model_id or key: Lock}
+        self._spawn_locks = {}
+        # Pending background loads {model_id: (Future, cancelled Event)}
+        self._load_futures = {}
+        self._shutting_down = False  # Set by shutdown(); no new servers after that
+        self._loader_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-loader")
 
     def set_model_catalog(self, models):
-        self.model_catalog = {model["id"]: model for model in models}
+        # The catalog is only ever replaced as a whole, read-only snapshot, so
+        # readers can use it without taking a lock
+        self.model_catalog = MappingProxyType(
+            {model["id"]: self._prepare_model(model) for model in models}
+        )
+
+    def _prepare_model(self, model):
+        """Copy a catalog entry and attach values precomputed once per catalog load."""
+        prefix, suffix = self._prompt_parts(model)
+        return {
+            **model,
+            "_runtime": model.get("runtime", "ollama"),
+            "_stop": list(model.get("stop_sequences", _DEFAULT_STOP)),
+            "_prompt_prefix": prefix,
+            "_prompt_suffix": suffix,
+        }
 
     def sync_loaded(self, model_ids):
-        self.loaded_models = set(model_ids)
+        with self._lock:
+            self.loaded_models = set(model_ids)
 
     def get_model_status(self, model_id):
         """Get the current status of a model: loading, loaded, error, or available."""
-        if model_id in self.loading_models:
-            return "loading"
-        elif model_id in self.loaded_models:
-            return "loaded"
-        elif model_id in self.model_errors:
-            return "error"
-        else:
-            return "available"
+        with self._lock:
+            if model_id in self.loading_models:
+                return "loading"
+            elif model_id in self.loaded_models:
+                return "loaded"
+            elif model_id in self.model_errors:
+                return "error"
+            else:
+                return "available"
     
     def get_model_error(self, model_id):
         """Get the error message for a model that failed to load."""
-        return self.model_errors.get(model_id)
+        with self._lock:
+            return self.model_errors.get(model_id)
 
     def load_model(self, model_id):
-        self.loading_models.add(model_id)
-        self.model_errors.pop(model_id, None)  # Clear any previous errors
-        
+        """Start loading a model in the background and return its Future.
+
+        Progress is reported through get_model_status(); waiting on the Future
+        re-raises the load error, if any.
+        """
+        self._get_model(model_id)
+        with self._lock:
+            pending = self._load_futures.get(model_id)
+            if pending is not None and not pending[0].done():
+                return pending[0]
+            self.loading_models.add(model_id)
+            self.model_errors.pop(model_id, None)  # Clear any previous errors
+            cancelled = threading.Event()
+            future = self._loader_pool.submit(self._do_load, model_id, cancelled)
+            self._load_futures[model_id] = (future, cancelled)
+        return future
+
+    def _do_load(self, model_id, cancelled):
         try:
             model = self._get_model(model_id)
-            runtime = model.get("runtime", "ollama")
+            runtime = model["_runtime"]
             logger.info("Loading model %s with runtime %s...", model_id, runtime)
             
             if runtime == "llamacpp":
                 self._ensure_llama_server(model_id, model)
-            
-            self.loaded_models.add(model_id)
-            logger.info("Model %s loaded successfully", model_id)
         except Exception as e:
+            # Re-resolve paths on the next attempt in case files were fixed
+            self._forget_paths(model_id)
             error_msg = str(e)
-            self.model_errors[model_id] = error_msg
+            with self._lock:
+                if not cancelled.is_set():
+                    self.model_errors[model_id] = error_msg
+                    self.loading_models.discard(model_id)
+                    self._load_futures.pop(model_id, None)
+            if cancelled.is_set():
+                # Most likely the unload stopping the half-started server
+                logger.info("Model %s was unloaded while loading", model_id)
+                raise ValueError("Model was unloaded while loading.") from e
             logger.error("ERROR loading model %s: %s", model_id, error_msg)
             raise
-        finally:
-            self.loading_models.discard(model_id)
+
+        with self._lock:
+            stale_server = None
+            if not cancelled.is_set():
+                self.loaded_models.add(model_id)
+                self.loading_models.discard(model_id)
+                self._load_futures.pop(model_id, None)
+            elif model_id not in self._load_futures and model_id not in self.loaded_models:
+                # Unloaded before the server was registered, and no newer load
+                # has picked it up since
+                stale_server = self._detach_server(model_id)
+        if cancelled.is_set():
+            self._teardown_server(stale_server)
+            logger.info("Model %s was unloaded while loading", model_id)
+            raise ValueError("Model was unloaded while loading.")
+        logger.info("Model %s loaded successfully", model_id)
 
     def unload_model(self, model_id):
-        self.loaded_models.discard(model_id)
+        with self._lock:
+            pending = self._load_futures.pop(model_id, None)
+            if pending is not None:
+                # The loader drops its result and stops any server it started
+                pending[1].set()
+                self.loading_models.discard(model_id)
+            self.loaded_models.discard(model_id)
+            self._forget_paths(model_id)
+            server = self._detach_server(model_id)
+        self._teardown_server(server)
+
+    def _detach_server(self, model_id):
+        """Unregister model_id's server and return it if nothing else uses it; call with _lock held."""
         server = self.llama_servers.pop(model_id, None)
+        if server is None:
+            return None
+        if any(other is server for other in self.llama_servers.values()):
+            return None  # Still serving another catalog entry
+        if self._shared_servers.get(server["key"]) is server:
+            del self._shared_servers[server["key"]]
+        return server
+
+    def _teardown_server(self, server):
+        # Stopping can take several seconds, so do it in the background
         if server:
-            server["process"].terminate()
-            try:
-                server["process"].wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                server["process"].kill()
-                server["process"].wait(timeout=5)
+            self._drop_connections(server["base_url"])
+            _teardown_pool.submit(self._stop_process, server["process"])
 
-    def reply(self, model_id, message):
-        if model_id not in self.loaded_models and self.loaded_models:
-            raise ValueError("Requested model is not loaded.")
+    def reply(self, model_id, message, stream=False):
+        """Generate a reply; raises ValueError("Model is loading.") until a pending load finishes.
+
+        With stream=True an iterator of text fragments is returned instead of a
+        string. Request errors are still raised before the first fragment.
+        """
+        with self._lock:
+            if model_id in self.loading_models:
+                raise ValueError("Model is loading.")
+            if model_id not in self.loaded_models and self.loaded_models:
+                raise ValueError("Requested model is not loaded.")
 
         model = self._get_model(model_id)
-        runtime = model.get("runtime", "ollama")
+        runtime = model["_runtime"]
 
         if runtime == "llamacpp":
             self._ensure_llama_server(model_id, model)
-            return self._llama_completion(model_id, model, message)
+            return self._llama_completion(model_id, model, message, stream=stream)
         if runtime == "ollama":
-            return self._ollama_completion(model, message)
+            reply = self._ollama_completion(model, message)
+            return iter((reply,)) if stream else reply
 
         raise ValueError(f"Unsupported runtime: {runtime}")
 
@@ -107,27 +287,101 @@ class LocalEngine:
             return sock.getsockname()[1]
 
     def _ensure_llama_server(self, model_id, model):
-        if model_id in self.llama_servers:
-            return
-
-        server_path = self._resolve_llama_server(model)
+        with self._lock:
+            # A server that is registered but still starting is waited on below
+            server = self.llama_servers.get(model_id)
+            if server is not None and server["ready"]:
+                return
+            spawn_lock = self._spawn_locks.setdefault(model_id, threading.Lock())
+        with spawn_lock:
+            with self._lock:
+                if model_id in self.llama_servers:
+                    return
+            self._start_llama_server(model_id, model)
+
+    def _start_llama_server(self, model_id, model):
+        server_path = self._resolve_llama_server(model_id, model)
         model_path = self._resolve_model_path(model)
-        port = int(model.get("port", 0)) or self._pick_free_port()
 
-        logger.debug("Loading model %s", model_id)
-        logger.debug("Server path: %s", server_path)
-        logger.debug("Server exists: %s", server_path.exists())
-        logger.debug("Model path: %s", model_path)
-        logger.debug("Model exists: %s", model_path.exists())
+        # The exists() checks cost a stat each, so only run them when logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Loading model %s", model_id)
+            logger.debug("Server path: %s", server_path)
+            logger.debug("Server exists: %s", self._exists(server_path))
+            logger.debug("Model path: %s", model_path)
+            logger.debug("Model exists: %s", self._exists(model_path))
+
+        # Catalog entries that would launch the same server (same binary, weights
+        # and options, e.g. one model listed under two profiles) share a process
+        # instead of mapping the weights and allocating a KV cache twice
+        server_args = self._llama_server_args(model, server_path, model_path)
+        configured_port = int(model.get("port", 0))
+        key = (tuple(server_args), configured_port)
+        with self._lock:
+            key_lock = self._spawn_locks.setdefault(key, threading.Lock())
+        # Identical entries loading at the same time wait here, then share
+        with key_lock:
+            if self._share_running_server(model_id, key):
+                return
+
+            self._prefetch_model_file(model_path)
+
+            # A picked port can be claimed by another process before llama-server
+            # binds it; retry on a fresh one unless the port is pinned in the catalog
+            attempts = 1 if configured_port else LLAMA_SPAWN_ATTEMPTS
+            for attempt in range(1, attempts + 1):
+                port = configured_port or self._pick_free_port()
+                try:
+                    self._spawn_llama_server(model_id, model, server_args, key, port)
+                    return
+                except ValueError as exc:
+                    if attempt == attempts or not _PORT_IN_USE_RE.search(str(exc)):
+                        raise
+                    logger.warning("Port %s was taken before llama-server bound it, retrying", port)
+
+    def _share_running_server(self, model_id, key):
+        """Point model_id at a running server with the same launch key, if there is one."""
+        with self._lock:
+            shared = self._shared_servers.get(key)
+            if shared is None:
+                return False
+            if shared["process"].poll() is not None:
+                del self._shared_servers[key]  # It has exited; start a fresh one
+                return False
+            self.llama_servers[model_id] = shared
+        logger.info("Model %s is sharing an already running llama-server", model_id)
+        return True
+
+    @staticmethod
+    def _prefetch_model_file(model_path):
+        """Ask the kernel to start reading the weights while llama-server boots."""
+        if not hasattr(os, "posix_fadvise"):
+            return
+        try:
+            fd = os.open(model_path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            size = os.fstat(fd).st_size
+            # Prefetching a model that can't fit would only evict other pages
+            available = _available_memory()
+            if available is not None and size > available:
+                return
+            # WILLNEED starts asynchronous readahead into the shared page cache.
+            # SEQUENTIAL only tunes this descriptor, which llama-server never sees
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError as exc:
+            logger.debug("Could not prefetch %s: %s", model_path, exc)
+        finally:
+            os.close(fd)
 
+    @staticmethod
+    def _llama_server_args(model, server_path, model_path):
+        """Build the llama-server command line, minus the listening address."""
         args = [
             str(server_path),
             "--model",
             str(model_path),
-            "--host",
-            "127.0.0.1",
-            "--port",
-            str(port),
         ]
 
         if "n_ctx" in model:
@@ -136,26 +390,147 @@ class LocalEngine:
             args.extend(["--n-gpu-layers", str(model["n_gpu_layers"])])
         for extra_arg in model.get("server_args", []):
             args.append(str(extra_arg))
+        return args
+
+    def _spawn_llama_server(self, model_id, model, server_args, key, port):
+        args = [*server_args, "--host", "127.0.0.1", "--port", str(port)]
 
-        # Suppress llama-server output to keep console clean
+        # Keep llama-server output off the console, but retain the stderr tail
+        # so startup failures can be reported with the real reason
         process = subprocess.Popen(
             args,
             cwd=str(self.repo_root),
             stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
+            stderr=subprocess.PIPE
         )
-        self.llama_servers[model_id] = {
+        stderr_tail = deque(maxlen=LLAMA_STDERR_TAIL_LINES)
+        stderr_reader = threading.Thread(
+            target=self._drain_stderr,
+            args=(process.stderr, stderr_tail),
+            daemon=True,
+        )
+        stderr_reader.start()
+        server = {
             "process": process,
             "base_url": f"http://127.0.0.1:{port}",
+            "stderr_tail": stderr_tail,
+            "key": key,
+            "ready": False,
         }
+        with self._lock:
+            shutting_down = self._shutting_down
+            if not shutting_down:
+                self.llama_servers[model_id] = server
+        if shutting_down:
+            # shutdown() has already collected the servers it will stop
+            self._stop_process(process)
+            raise ValueError("Server is shutting down.")
+
+        # Loading a multi-GB model from slow storage can take as long as a reply
+        timeout = float(model.get("startup_timeout", model.get("timeout", 120)))
+        try:
+            self._wait_for_llama_server(
+                process,
+                server["base_url"],
+                stderr_reader,
+                stderr_tail,
+                timeout,
+            )
+        except ValueError:
+            with self._lock:
+                if self.llama_servers.get(model_id) is server:
+                    del self.llama_servers[model_id]
+            self._stop_process(process)
+            raise
+        # Only offer the server for sharing once it is known to be up, and
+        # not if an unload detached it (and queued its teardown) meanwhile
+        with self._lock:
+            if self.llama_servers.get(model_id) is server:
+                server["ready"] = True
+                self._shared_servers.setdefault(key, server)
+
+    def _drain_stderr(self, stream, tail):
+        with stream:
+            for line in stream:
+                tail.append(line.decode("utf-8", errors="replace"))
+
+    def _wait_for_llama_server(self, process, base_url, stderr_reader, stderr_tail, timeout):
+        """Poll /health until the model is loaded, the server exits, or the timeout expires."""
+        parsed = urlparse(f"{base_url}/health")
+        deadline = time.monotonic() + timeout
+        interval = LLAMA_READY_POLL_INTERVAL
+        while True:
+            returncode = process.poll()
+            if returncode is not None:
+                # Let the reader thread collect the final lines before reporting
+                stderr_reader.join(timeout=1)
+                raise ValueError(
+                    f"llama-server exited with code {returncode}:\n{''.join(stderr_tail)}"
+                )
+            # Check before sleeping so an already-loaded server costs nothing
+            if self._health_status(parsed) == 200:
+                return
+            if time.monotonic() >= deadline:
+                raise ValueError(
+                    f"llama-server did not finish loading the model within {timeout:g}s:\n"
+                    f"{''.join(stderr_tail)}"
+                )
+            time.sleep(interval)
+            interval = min(interval * 2, LLAMA_READY_MAX_POLL_INTERVAL)
+
+    def _health_status(self, parsed):
+        """Return the HTTP status of a GET to the URL, or None if it can't be reached yet."""
+        conn, _ = self._acquire_connection(parsed, LLAMA_HEALTH_TIMEOUT)
+        try:
+            conn.request("GET", parsed.path)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            return None
+        self._release_connection(parsed, conn, response)
+        return response.status
+
+    def _stop_process(self, process):
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait(timeout=5)
+
+    def _exists(self, path):
+        exists = self._stat_cache.get(path)
+        if exists is None:
+            try:
+                os.stat(path)
+                exists = True
+            except OSError:
+                exists = False
+            self._stat_cache[path] = exists
+        return exists
+
+    def _forget_paths(self, model_id):
+        self._stat_cache.clear()
+        self._server_path_cache.pop(model_id, None)
+        model = self.model_catalog.get(model_id)
+        if model is not None:
+            self._model_path_cache.pop(model.get("artifact"), None)
 
-        time.sleep(0.5)
-
-    def _resolve_llama_server(self, model):
+    def _resolve_llama_server(self, model_id, model):
+        override = os.environ.get("LLM_BOX_LLAMA_CPP_SERVER_PATH")
+        cache_key = (override, model.get("server_path"))
+        cached = self._server_path_cache.get(model_id)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+        selected = self._find_llama_server(model, override)
+        self._server_path_cache[model_id] = (cache_key, selected)
+        return selected
+
+    def _find_llama_server(self, model, override):
         def _log_selection(path, reason):
             logger.info("llama.cpp server selected (%s): %s", reason, path)
 
-        override = os.environ.get("LLM_BOX_LLAMA_CPP_SERVER_PATH")
         if override:
             selected = Path(override)
             _log_selection(selected, "override")
@@ -170,59 +545,65 @@ class LocalEngine:
             return resolved
 
         base_dir = self.repo_root / "app" / "backend" / "runtimes" / "llama.cpp"
-
-        if os.name == "nt":
-            binary_name = "llama-server.exe"
-        else:
-            binary_name = "llama-server"
+        binary_name = _BINARY_NAME
 
         # Check flat structure first
-        if (base_dir / binary_name).exists():
+        if self._exists(base_dir / binary_name):
             selected = base_dir / binary_name
             _log_selection(selected, "flat layout")
             return selected
 
-        system = platform.system().lower()
-        machine = platform.machine().lower()
-        is_arm = machine in {"arm64", "aarch64"}
-
-        if system == "windows":
-            pattern_order = ["*-bin-win-cpu-x64"]
-        elif system == "darwin":
-            if is_arm:
-                pattern_order = ["*-bin-macos-arm64", "*-bin-macos-x64"]
-            else:
-                pattern_order = ["*-bin-macos-x64", "*-bin-macos-arm64"]
-        elif system == "linux":
-            pattern_order = ["*-bin-ubuntu-x64"]
-        else:
-            pattern_order = []
-
-        for pattern in pattern_order:
-            for build_dir in sorted(base_dir.glob(pattern)):
+        for pattern in _BUILD_PATTERNS.get(_SYSTEM, []):
+            # First match wins, so iterate lazily instead of sorting every directory
+            for build_dir in base_dir.glob(pattern):
+                # Probe the known release layouts before walking the whole tree
+                for candidate in (build_dir / "bin" / binary_name, build_dir / binary_name):
+                    if self._exists(candidate):
+                        _log_selection(candidate, f"build match {build_dir.name}")
+                        return candidate
                 matches = list(build_dir.glob(f"**/{binary_name}"))
                 if matches:
                     selected = matches[0]
                     _log_selection(selected, f"build match {build_dir.name}")
                     return selected
 
-        # Recursively search subdirectories as a fallback
-        matching = list(base_dir.glob(f"**/{binary_name}"))
-        if matching:
-            selected = matching[0]
+        # Search a couple of subdirectory levels as a fallback
+        selected = self._scan_for_binary(base_dir, binary_name, depth=2)
+        if selected is not None:
             _log_selection(selected, "fallback scan")
             return selected
 
         # Return default path (will fail with clear error if not found)
         return base_dir / binary_name
 
+    def _scan_for_binary(self, directory, binary_name, depth):
+        """Breadth-first search for binary_name in directory and up to depth levels below it."""
+        level = [directory]
+        for _ in range(depth + 1):
+            next_level = []
+            for current in level:
+                try:
+                    with os.scandir(current) as entries:
+                        for entry in entries:
+                            if entry.name == binary_name and entry.is_file():
+                                return Path(entry.path)
+                            if entry.is_dir():
+                                next_level.append(entry.path)
+                except OSError:
+                    continue
+            level = next_level
+        return None
+
     def _resolve_model_path(self, model):
         artifact = model.get("artifact")
         if not artifact:
             raise ValueError("Model artifact is not configured.")
-        resolved = Path(artifact)
-        if not resolved.is_absolute():
-            resolved = self.repo_root / resolved
+        resolved = self._model_path_cache.get(artifact)
+        if resolved is None:
+            resolved = Path(artifact)
+            if not resolved.is_absolute():
+                resolved = self.repo_root / resolved
+            self._model_path_cache[artifact] = resolved
         return resolved
 
     def _ollama_completion(self, model, message):
@@ -236,8 +617,9 @@ class LocalEngine:
         response = self._post_json(f"{base_url}/api/generate", payload)
         return response.get("response", "").strip()
 
-    def _llama_completion(self, model_id, model, message):
-        server = self.llama_servers.get(model_id)
+    def _llama_completion(self, model_id, model, message, stream=False):
+        with self._lock:
+            server = self.llama_servers.get(model_id)
         if server is None:
             raise ValueError("Model server is not running.")
         base_url = server["base_url"]
@@ -249,11 +631,16 @@ class LocalEngine:
             "prompt": formatted_prompt,
             "n_predict": int(model.get("n_predict", 512)),
             "temperature": float(model.get("temperature", 0.7)),
-            "stop": model.get("stop_sequences", ["</s>", "<|im_end|>", "\n\nUser:", "\n\nQuestion:"]),
+            "stop": model["_stop"],
         }
         
         # Use longer timeout for reasoning models
         timeout = int(model.get("timeout", 120))
+        if stream:
+            # Fragments are passed through as generated; <think> blocks are not stripped
+            payload["stream"] = True
+            events = self._post_events(f"{base_url}/completion", payload, timeout=timeout)
+            return (event["content"] for event in events if event.get("content"))
         response = self._post_json(f"{base_url}/completion", payload, timeout=timeout)
         content = response.get("content")
         if content is not None:
@@ -265,6 +652,10 @@ class LocalEngine:
     
     def _format_prompt(self, model, message):
         """Format the user message into the model's expected prompt template."""
+        return model["_prompt_prefix"] + message + model["_prompt_suffix"]
+
+    def _prompt_parts(self, model):
+        """Return the (prefix, suffix) that wrap the user message for the model's template."""
         template = model.get("prompt_template", "chatml")
         is_reasoning = model.get("is_reasoning_model", False)
         
@@ -274,36 +665,159 @@ class LocalEngine:
                 system_msg = "You are a helpful assistant. Answer the question directly and concisely. Do not show your thinking process or reasoning steps. Only provide the final answer."
             else:
                 system_msg = "You are a helpful assistant. Provide clear, concise answers."
-            return f"<|im_start|>system\n{system_msg}<|im_end|>\n<|im_start|>user\n{message}<|im_end|>\n<|im_start|>assistant\n"
+            return (
+                f"<|im_start|>system\n{system_msg}<|im_end|>\n<|im_start|>user\n",
+                "<|im_end|>\n<|im_start|>assistant\n",
+            )
         elif template == "llama3":
             # Llama 3 format
             system_msg = "You are a helpful assistant. Provide clear, concise answers."
-            return f"<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n\n{system_msg}<|eot_id|><|start_header_id|>user<|end_header_id|>\n\n{message}<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n"
+            return (
+                f"<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n\n{system_msg}<|eot_id|><|start_header_id|>user<|end_header_id|>\n\n",
+                "<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n",
+            )
         else:
             # Fallback: simple instruct format
-            return f"### Instruction:\n{message}\n\n### Response:\n"
+            return "### Instruction:\n", "\n\n### Response:\n"
     
     def _strip_reasoning_tags(self, text):
         """Remove reasoning model <think> tags and extract only the final answer."""
-        import re
+        if '<think>' not in text:
+            return text.strip()
         # Remove everything between <think> and </think> tags (reasoning steps)
-        cleaned = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL)
-        return cleaned.strip()
+        return _THINK_RE.sub('', text).strip()
+
+    def shutdown(self):
+        """Stop every llama-server this engine started, waiting for them to exit.
+
+        The processes would otherwise outlive the app, holding their memory and
+        ports. Pending loads that spawn a server after this stop it themselves.
+        """
+        with self._lock:
+            self._shutting_down = True
+            servers = {id(server): server for server in self.llama_servers.values()}
+            servers.update((id(server), server) for server in self._shared_servers.values())
+            self.llama_servers.clear()
+            self._shared_servers.clear()
+            self.loaded_models.clear()
+        processes = [server["process"] for server in servers.values()]
+        # Signal them all first so they shut down in parallel, and stay within
+        # the launcher's grace period before it kills us
+        for process in processes:
+            process.terminate()
+        deadline = time.monotonic() + LLAMA_SHUTDOWN_TIMEOUT
+        for process in processes:
+            try:
+                process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    def close(self):
+        """Close every pooled runtime connection."""
+        with self._http_lock:
+            pools = list(self._http_pool.values())
+            self._http_pool.clear()
+        for pool in pools:
+            for conn in pool:
+                conn.close()
+
+    def _drop_connections(self, base_url):
+        parsed = urlparse(base_url)
+        with self._http_lock:
+            pool = self._http_pool.pop((parsed.scheme, parsed.hostname, parsed.port), [])
+        for conn in pool:
+            conn.close()
+
+    def _acquire_connection(self, parsed, timeout):
+        """Return (connection, reused), preferring an idle keep-alive connection."""
+        key = (parsed.scheme, parsed.hostname, parsed.port)
+        with self._http_lock:
+            pool = self._http_pool.get(key)
+            conn = pool.pop() if pool else None
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        if parsed.scheme == "https":
+            return http.client.HTTPSConnection(parsed.hostname, parsed.port, timeout=timeout), False
+        return http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=timeout), False
+
+    def _release_connection(self, parsed, conn, response):
+        if response.will_close:
+            conn.close()
+            return
+        key = (parsed.scheme, parsed.hostname, parsed.port)
+        with self._http_lock:
+            pool = self._http_pool.setdefault(key, [])
+            if len(pool) < HTTP_POOL_MAXSIZE:
+                pool.append(conn)
+                return
+        conn.close()
+
+    def _send_json(self, parsed, payload, timeout):
+        """POST a JSON payload and return (connection, response) once the headers arrive."""
+        body = _json_dumps(payload)
+        path = parsed.path or "/"
+        while True:
+            conn, reused = self._acquire_connection(parsed, timeout)
+            try:
+                conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+                return conn, conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as exc:
+                conn.close()
+                if reused:
+                    # The runtime closed an idle keep-alive socket; retry on a fresh one
+                    continue
+                raise ValueError(f"Runtime request failed: {exc}") from exc
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                raise ValueError(f"Runtime request failed: {exc}") from exc
 
     def _post_json(self, url, payload, timeout=30):
-        body = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(
-            url,
-            data=body,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
+        parsed = urlparse(url)
+        conn, response = self._send_json(parsed, payload, timeout)
         try:
-            with urllib.request.urlopen(request, timeout=timeout) as response:
-                return json.loads(response.read().decode("utf-8"))
-        except urllib.error.URLError as exc:
+            data = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            conn.close()
             raise ValueError(f"Runtime request failed: {exc}") from exc
 
+        self._release_connection(parsed, conn, response)
+        if response.status >= 400:
+            raise ValueError(
+                f"Runtime request failed: HTTP Error {response.status}: {response.reason}"
+            )
+        return _json_loads(data)
+
+    def _post_events(self, url, payload, timeout=30):
+        """POST a JSON payload and return an iterator over its server-sent event payloads."""
+        parsed = urlparse(url)
+        conn, response = self._send_json(parsed, payload, timeout)
+        if response.status >= 400:
+            conn.close()
+            raise ValueError(
+                f"Runtime request failed: HTTP Error {response.status}: {response.reason}"
+            )
+        return self._iter_events(parsed, conn, response)
+
+    def _iter_events(self, parsed, conn, response):
+        finished = False
+        try:
+            for line in response:
+                if line.startswith(b"data:"):
+                    yield _json_loads(line[5:])
+            finished = True
+        except (OSError, http.client.HTTPException) as exc:
+            raise ValueError(f"Runtime request failed: {exc}") from exc
+        finally:
+            # A stream abandoned halfway leaves unread data on the socket
+            if finished:
+                self._release_connection(parsed, conn, response)
+            else:
+                conn.close()
+
     def _assert_local_url(self, url):
         if self.allow_remote:
             return
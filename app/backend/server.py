@@ -1,19 +1,32 @@
 #!/usr/bin/env python3
 import argparse
 import hashlib
-import json
+import hmac
 import logging
 import os
+import queue
+import re
+import secrets
+import shutil
+import signal
+import socket
 import sys
+import time
+from concurrent.futures import as_completed
 from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain, count
 from http import HTTPStatus
 from http.server import SimpleHTTPRequestHandler
 from pathlib import Path
 from socketserver import ThreadingTCPServer
-from threading import Lock
+from threading import Event, Lock, Thread
+from typing import Optional
 from urllib.parse import parse_qs, urlparse
 
 backend_dir = Path(__file__).resolve().parent
+REPO_ROOT = backend_dir.parents[1]
 if str(backend_dir) not in sys.path:
     sys.path.insert(0, str(backend_dir))
 
@@ -28,12 +41,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-from engine import LocalEngine
+from engine import LocalEngine, _json_dumps, _json_loads
 DEFAULT_USERNAME = "llminabox"
 DEFAULT_PASSWORD = "myllm"
 PASSWORD_HASH_PREFIX = "pbkdf2$"
 PASSWORD_HASH_ITERATIONS = 120000
 
+# Request bodies larger than these are refused before anything is read
+MAX_JSON_BODY = 1 << 20
+MAX_UPLOAD = 1 << 30
+# Uploads are streamed into a temporary with this prefix, then renamed
+UPLOAD_TEMP_PREFIX = ".upload-"
+
+_BOUNDARY_RE = re.compile(r'boundary=([^;]+)')
+_FILENAME_RE = re.compile(rb'filename="([^"]+)"')
+
 
 def hash_password(password: str) -> str:
     salt = os.urandom(16)
@@ -49,6 +71,13 @@ def hash_password(password: str) -> str:
     )
 
 
+@lru_cache(maxsize=1)
+def default_password_hash():
+    # Hashed on first use rather than at import, so --help and argument errors
+    # don't pay for PBKDF2; resets then reuse the same hash
+    return hash_password(DEFAULT_PASSWORD)
+
+
 def verify_password(stored_password: str, provided_password: str) -> bool:
     if stored_password.startswith(PASSWORD_HASH_PREFIX):
         try:
@@ -64,8 +93,10 @@ def verify_password(stored_password: str, provided_password: str) -> bool:
             salt,
             iterations,
         )
-        return computed == expected
-    return stored_password == provided_password
+        return hmac.compare_digest(computed, expected)
+    return hmac.compare_digest(
+        stored_password.encode("utf-8"), provided_password.encode("utf-8")
+    )
 
 
 def is_truthy(value) -> bool:
@@ -103,17 +134,60 @@ DEFAULT_MODELS = [
     },
 ]
 MODELS = DEFAULT_MODELS.copy()
+# Lookups derived from MODELS; rebuilt by set_models() whenever it changes
+MODEL_BY_ID = {model["id"]: model for model in MODELS}
+MODEL_IDS = frozenset(MODEL_BY_ID)
 
 SESSION = {"authenticated": False, "user": None}
-STATE_LOCK = Lock()
+# Anything that can change the session payload moves SESSION_GENERATION on,
+# which retires the cached /api/session response body
+_session_generations = count(1)
+SESSION_GENERATION = 0
+_session_body_cache = (None, None)  # (generation, encoded payload)
+# Each RuntimeState field has its own lock so handlers touching unrelated
+# fields don't serialize on each other. Never call write_state() while
+# holding one of these: it takes SAVE_LOCK and then each field lock.
+USERS_LOCK = Lock()
+MUST_CHANGE_LOCK = Lock()
+LOADED_MODELS_LOCK = Lock()
+EULA_LOCK = Lock()
+SAVE_LOCK = Lock()
+# Set by save_state(); the background writer coalesces changes made within
+# STATE_SAVE_DELAY seconds into one write
+STATE_DIRTY = Event()
+STATE_SAVE_DELAY = 0.05
+# Printed on stdout once the server is accepting connections
+READY_SENTINEL = "LLMBOX_READY"
+# Startup banner, built once; the URL line is filled in when it is logged
+READY_BANNER = "\n".join([
+    "",
+    "#" * 60,
+    "#" + " " * 58 + "#",
+    "#" + "  LLM-in-a-Box is READY!".center(58) + "#",
+    "#%s#",
+    "#" + " " * 58 + "#",
+    "#" * 60,
+    "",
+])
+# Set once the startup reload of previously loaded models has finished
+RELOAD_DONE = Event()
 
 
 @dataclass
 class RuntimeState:
+    # Declared by hand rather than dataclass(slots=True) to stay importable on
+    # Python 3.9; the fields have no defaults, so plain slots work
+    __slots__ = (
+        "users", "must_change_password", "loaded_models", "eula_accepted", "active_model",
+    )
+
     users: dict
     must_change_password: dict
     loaded_models: set
     eula_accepted: bool
+    # Lowest loaded model id, which chat requests go to. Derived from
+    # loaded_models, guarded by LOADED_MODELS_LOCK and never persisted
+    active_model: Optional[str]
 
     def to_payload(self):
         return {
@@ -124,37 +198,138 @@ class RuntimeState:
         }
 
 
-STATE = RuntimeState(
-    users={DEFAULT_USERNAME: hash_password(DEFAULT_PASSWORD)},
-    must_change_password={DEFAULT_USERNAME: True},
-    loaded_models=set(),
-    eula_accepted=False,
-)
+def default_state():
+    return RuntimeState(
+        users={DEFAULT_USERNAME: default_password_hash()},
+        must_change_password={DEFAULT_USERNAME: True},
+        loaded_models=set(),
+        eula_accepted=False,
+        active_model=None,
+    )
+
+
+STATE = None  # Built by main() once the arguments have been parsed
 
 STATE_PATH = None
 LIBRARY_PATH = None
 SAVED_CHATS_PATH = None
 PERSONAL_FILES_PATH = None
 EULA_PATH = None
+LAST_SAVED_STATE = None  # Serialized state last written to STATE_PATH
 ENGINE = LocalEngine()
 
 
+def parse_content_length(handler):
+    """Return the request's Content-Length as an int, or None if it is malformed."""
+    try:
+        length = int(handler.headers.get("Content-Length", "0"))
+    except ValueError:
+        return None
+    return length if length >= 0 else None
+
+
 def json_response(handler, payload, status=HTTPStatus.OK):
-    body = json.dumps(payload).encode("utf-8")
+    # Callers holding an already-encoded body can pass the bytes directly
+    body = payload if isinstance(payload, bytes) else _json_dumps(payload)
     handler.send_response(status)
     handler.send_header("Content-Type", "application/json")
     handler.send_header("Content-Length", str(len(body)))
+    if status >= HTTPStatus.BAD_REQUEST:
+        # Error paths may leave the request body unread, so don't reuse the connection
+        handler.send_header("Connection", "close")
+        handler.close_connection = True
     handler.end_headers()
     handler.wfile.write(body)
 
 
+def stream_response(handler, chunks, first=""):
+    """Send text fragments as a chunked plain-text response, one HTTP chunk each.
+
+    The response is already committed once this is called, so an error while
+    streaming can only end the connection without the terminating chunk.
+    """
+    handler.send_response(HTTPStatus.OK)
+    handler.send_header("Content-Type", "text/plain; charset=utf-8")
+    handler.send_header("Transfer-Encoding", "chunked")
+    handler.send_header("X-Content-Type-Options", "nosniff")
+    handler.end_headers()
+    try:
+        for text in chain((first,), chunks):
+            data = text.encode("utf-8")
+            if data:
+                handler.wfile.write(b"%x\r\n%b\r\n" % (len(data), data))
+                handler.wfile.flush()
+    except ValueError as exc:
+        logger.warning("Streaming reply ended early: %s", exc)
+        handler.close_connection = True
+        return
+    handler.wfile.write(b"0\r\n\r\n")
+
+
+class LlmBoxServer(ThreadingTCPServer):
+    """Threaded server that hands connections to a fixed pool of worker threads."""
+
+    # Handler threads never need joining: state is flushed separately on
+    # shutdown, and non-daemon threads would otherwise be tracked in a list
+    # that grows with every connection for the life of the server
+    daemon_threads = True
+    block_on_close = False
+    allow_reuse_address = True
+    request_queue_size = 128
+    # A keep-alive connection holds its worker until it goes idle, and a
+    # browser opens about six per host, so don't let small machines starve
+    worker_count = max(32, (os.cpu_count() or 1) * 4)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._requests = queue.SimpleQueue()
+        for index in range(self.worker_count):
+            Thread(target=self._worker, name=f"http-worker-{index}", daemon=True).start()
+
+    def _worker(self):
+        while True:
+            request, client_address = self._requests.get()
+            self.process_request_thread(request, client_address)
+
+    def get_request(self):
+        request, client_address = super().get_request()
+        # Responses are written as several small sends (headers, then body);
+        # don't let Nagle hold the second one back waiting for an ACK
+        request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return request, client_address
+
+    def process_request(self, request, client_address):
+        # Reuse a pooled thread instead of starting one per connection
+        self._requests.put((request, client_address))
+
+
 class LlmBoxHandler(SimpleHTTPRequestHandler):
+    # Keep-alive lets the frontend reuse one connection (and handler thread)
+    # for its polling and API calls instead of reconnecting per request
+    protocol_version = "HTTP/1.1"
+    # Close keep-alive connections that sit idle so they give their pooled
+    # worker back
+    timeout = 15
+
     def do_GET(self):
         parsed = urlparse(self.path)
         if parsed.path.startswith("/api/"):
             return self.handle_api_get(parsed)
         return super().do_GET()
 
+    def copyfile(self, source, outputfile):
+        # Static assets go straight from the page cache to the socket.
+        # socket.sendfile falls back to plain sends for in-memory sources such
+        # as directory listings and on platforms without os.sendfile
+        self.connection.sendfile(source)
+
+    def log_error(self, format, *args):
+        # Browsers leave idle keep-alive connections open, so the timeout above
+        # closing one is routine and shouldn't reach the console every time
+        if format.startswith("Request timed out"):
+            return
+        super().log_error(format, *args)
+
     def do_POST(self):
         parsed = urlparse(self.path)
         if parsed.path.startswith("/api/"):
@@ -164,7 +339,9 @@ class LlmBoxHandler(SimpleHTTPRequestHandler):
     def handle_api_get(self, parsed):
         path = parsed.path
         if path == "/api/session":
-            return json_response(self, build_session_payload())
+            return json_response(self, session_payload_body())
+        if path == "/api/status":
+            return json_response(self, build_status_payload())
         if path == "/api/eula":
             return handle_eula(self)
         if path == "/api/models":
@@ -173,6 +350,8 @@ class LlmBoxHandler(SimpleHTTPRequestHandler):
             return handle_library_list(self, parsed.query)
         if path == "/api/library/file":
             return handle_library_file(self, parsed.query)
+        if path == "/api/library/raw":
+            return handle_library_raw(self, parsed.query)
         if path == "/api/storage/info":
             return handle_storage_info(self)
         return json_response(self, {"error": "Not found"}, status=HTTPStatus.NOT_FOUND)
@@ -183,11 +362,28 @@ class LlmBoxHandler(SimpleHTTPRequestHandler):
             return handle_file_upload(self)
         
         # For all other POST endpoints, parse JSON payload
-        length = int(self.headers.get("Content-Length", "0"))
-        raw = self.rfile.read(length) if length else b"{}"
+        length = parse_content_length(self)
+        if length is None:
+            return json_response(
+                self,
+                {"error": "Invalid Content-Length."},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+        if length > MAX_JSON_BODY:
+            return json_response(
+                self,
+                {"error": "Request body too large."},
+                status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            )
         try:
-            payload = json.loads(raw)
-        except json.JSONDecodeError:
+            if length:
+                raw = bytearray(length)
+                if self.rfile.readinto(raw) != length:
+                    raise ValueError("Request body ended early.")
+                payload = _json_loads(raw)
+            else:
+                payload = {}
+        except ValueError:
             return json_response(
                 self,
                 {"error": "Invalid JSON payload"},
@@ -204,6 +400,8 @@ class LlmBoxHandler(SimpleHTTPRequestHandler):
             return handle_model_action(self, payload)
         if path == "/api/chat":
             return handle_chat(self, payload)
+        if path == "/api/chat/stream":
+            return handle_chat_stream(self, payload)
         if path == "/api/chat/save":
             return handle_save_chat(self, payload)
         if path == "/api/reset-password":
@@ -225,42 +423,53 @@ def handle_login(handler, payload):
             {"error": "Username and password are required."},
             status=HTTPStatus.BAD_REQUEST,
         )
-    with STATE_LOCK:
-        if not STATE.eula_accepted and not accepted_eula:
-            return json_response(
-                handler,
-                {"error": "You must accept the EULA before signing in."},
-                status=HTTPStatus.BAD_REQUEST,
-            )
+    with EULA_LOCK:
+        eula_accepted = STATE.eula_accepted
+    if not eula_accepted and not accepted_eula:
+        return json_response(
+            handler,
+            {"error": "You must accept the EULA before signing in."},
+            status=HTTPStatus.BAD_REQUEST,
+        )
 
+    with USERS_LOCK:
         stored_password = STATE.users.get(username)
-        if stored_password is None or not verify_password(stored_password, password):
-            return json_response(
-                handler,
-                {"error": "Invalid username or password."},
-                status=HTTPStatus.UNAUTHORIZED,
-            )
-
-        should_save = False
-        if not stored_password.startswith(PASSWORD_HASH_PREFIX):
-            STATE.users[username] = hash_password(password)
-            should_save = True
-
-        if not STATE.eula_accepted:
-            STATE.eula_accepted = True
-            should_save = True
+    if stored_password is None or not verify_password(stored_password, password):
+        return json_response(
+            handler,
+            {"error": "Invalid username or password."},
+            status=HTTPStatus.UNAUTHORIZED,
+        )
 
-        if should_save:
-            save_state()
+    should_save = False
+    if not stored_password.startswith(PASSWORD_HASH_PREFIX):
+        # Upgrade legacy plaintext passwords, hashing outside the lock and
+        # only swapping in the hash if nobody changed the password meanwhile
+        new_hash = hash_password(password)
+        with USERS_LOCK:
+            if STATE.users.get(username) == stored_password:
+                STATE.users[username] = new_hash
+                should_save = True
+
+    if not eula_accepted:
+        with EULA_LOCK:
+            if not STATE.eula_accepted:
+                STATE.eula_accepted = True
+                should_save = True
+
+    if should_save:
+        save_state()
 
     SESSION["authenticated"] = True
     SESSION["user"] = username
-    return json_response(handler, build_session_payload())
+    invalidate_session_payload()
+    return json_response(handler, session_payload_body())
 
 
 def handle_logout(handler):
     SESSION["authenticated"] = False
     SESSION["user"] = None
+    invalidate_session_payload()
     return json_response(handler, {"authenticated": False})
 
 
@@ -278,10 +487,12 @@ def handle_password_change(handler, payload):
             {"error": "Password must be at least 6 characters."},
             status=HTTPStatus.BAD_REQUEST,
         )
-    with STATE_LOCK:
-        STATE.users[SESSION["user"]] = hash_password(new_password)
+    password_hash = hash_password(new_password)
+    with USERS_LOCK:
+        STATE.users[SESSION["user"]] = password_hash
+    with MUST_CHANGE_LOCK:
         STATE.must_change_password[SESSION["user"]] = False
-        save_state()
+    save_state()
     return json_response(handler, {"success": True})
 
 def handle_model_action(handler, payload):
@@ -299,22 +510,25 @@ def handle_model_action(handler, payload):
             {"error": "Invalid model action"},
             status=HTTPStatus.BAD_REQUEST,
         )
-    if model_id not in {model["id"] for model in MODELS}:
+    if model_id not in MODEL_IDS:
         return json_response(
             handler,
             {"error": "Unknown model id"},
             status=HTTPStatus.BAD_REQUEST,
         )
     if action == "load":
-        with STATE_LOCK:
+        with LOADED_MODELS_LOCK:
             STATE.loaded_models.add(model_id)
-            ENGINE.load_model(model_id)
-            save_state()
+            if STATE.active_model is None or model_id < STATE.active_model:
+                STATE.active_model = model_id
+        ENGINE.load_model(model_id)
     else:
-        with STATE_LOCK:
+        with LOADED_MODELS_LOCK:
             STATE.loaded_models.discard(model_id)
-            ENGINE.unload_model(model_id)
-            save_state()
+            if STATE.active_model == model_id:
+                STATE.active_model = min(STATE.loaded_models, default=None)
+        ENGINE.unload_model(model_id)
+    save_state()
     return json_response(handler, {"models": build_model_payload()})
 
 
@@ -343,10 +557,8 @@ def handle_chat(handler, payload):
         )
     
     # Find model name for display
-    model_name = next(
-        (m["name"] for m in MODELS if m["id"] == model_id),
-        model_id
-    )
+    model = MODEL_BY_ID.get(model_id)
+    model_name = model["name"] if model else model_id
     
     return json_response(handler, {
         "reply": reply,
@@ -355,6 +567,35 @@ def handle_chat(handler, payload):
     })
 
 
+def handle_chat_stream(handler, payload):
+    if not SESSION["authenticated"]:
+        return json_response(
+            handler,
+            {"error": "Unauthorized"},
+            status=HTTPStatus.UNAUTHORIZED,
+        )
+    message = payload.get("message", "").strip()
+    if not message:
+        return json_response(
+            handler,
+            {"error": "Message cannot be empty"},
+            status=HTTPStatus.BAD_REQUEST,
+        )
+    model_id = select_chat_model()
+    # Pull the first fragment before committing to a 200 so that failures
+    # which only surface once generation starts still get a JSON error
+    try:
+        chunks = ENGINE.reply(model_id, message, stream=True)
+        first = next(chunks, "")
+    except ValueError as exc:
+        return json_response(
+            handler,
+            {"error": str(exc)},
+            status=HTTPStatus.BAD_REQUEST,
+        )
+    return stream_response(handler, chunks, first)
+
+
 def handle_library_list(handler, query):
     if not SESSION["authenticated"]:
         return json_response(
@@ -370,11 +611,8 @@ def handle_library_list(handler, query):
     if library_type == "server-log":
         try:
             if LOG_PATH.exists():
-                with LOG_PATH.open("r", encoding="utf-8") as f:
-                    # Read last 100 lines
-                    lines = f.readlines()
-                    tail_lines = lines[-100:] if len(lines) > 100 else lines
-                    return json_response(handler, {"log": "".join(tail_lines)})
+                # Read last 100 lines
+                return json_response(handler, {"log": tail_file(LOG_PATH, 100)})
             else:
                 return json_response(handler, {"log": "Server log not available yet."})
         except Exception as e:
@@ -386,73 +624,156 @@ def handle_library_list(handler, query):
     files = []
     
     # For personal files, show all file types
-    if library_type == "personal":
-        glob_pattern = "*"
-    else:
-        glob_pattern = "*.txt"
-    
-    for entry in sorted(library_dir.glob(glob_pattern), key=lambda x: x.stat().st_mtime, reverse=True):
-        if entry.is_file():
-            stat = entry.stat()
-            file_info = {
-                "name": entry.name,
-                "size": stat.st_size,
-                "modified": stat.st_mtime,
-            }
-            
-            # For personal files, add file extension info
-            if library_type == "personal":
-                file_info["extension"] = entry.suffix.lower()
-                file_info["clickable"] = entry.suffix.lower() == ".txt"
-            else:
-                file_info["clickable"] = True
-            
-            files.append(file_info)
+    show_all = library_type == "personal"
+    
+    # scandir gives each entry's type and caches its stat, so a listing costs
+    # one stat per file instead of two plus the glob's own lookups
+    entries = []
+    with os.scandir(library_dir) as scan:
+        for entry in scan:
+            # In-progress uploads are written to hidden temporaries first
+            if entry.name.startswith(UPLOAD_TEMP_PREFIX):
+                continue
+            if not show_all and not entry.name.endswith(".txt"):
+                continue
+            if entry.is_file():
+                entries.append((entry.stat().st_mtime, entry))
+    entries.sort(key=lambda item: item[0], reverse=True)
+    
+    for modified, entry in entries:
+        file_info = {
+            "name": entry.name,
+            "size": entry.stat().st_size,
+            "modified": modified,
+        }
+        
+        # For personal files, add file extension info
+        if show_all:
+            extension = os.path.splitext(entry.name)[1].lower()
+            file_info["extension"] = extension
+            file_info["clickable"] = extension == ".txt"
+        else:
+            file_info["clickable"] = True
+        
+        files.append(file_info)
     
     return json_response(handler, {"files": files})
 
 
-def handle_library_file(handler, query):
+def tail_file(path, line_count, block_size=65536):
+    """Return the last line_count lines of a text file, reading backwards from the end."""
+    with path.open("rb") as handle:
+        position = handle.seek(0, os.SEEK_END)
+        chunks = []
+        newlines = 0
+        # One extra newline guarantees the first kept line is complete
+        while position > 0 and newlines <= line_count:
+            read_size = min(block_size, position)
+            position -= read_size
+            handle.seek(position)
+            chunk = handle.read(read_size)
+            newlines += chunk.count(b"\n")
+            chunks.append(chunk)
+    lines = b"".join(reversed(chunks)).splitlines(keepends=True)[-line_count:]
+    text = b"".join(lines).decode("utf-8", errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+_usage_cache = (0.0, None, None)  # (monotonic timestamp, path, disk usage)
+
+
+def cached_disk_usage(path, ttl=1.0):
+    """Return shutil.disk_usage(path), reusing a result younger than ttl seconds."""
+    global _usage_cache
+    timestamp, cached_path, usage = _usage_cache
+    now = time.monotonic()
+    if usage is None or cached_path != path or now - timestamp >= ttl:
+        usage = shutil.disk_usage(path)
+        _usage_cache = (now, path, usage)
+    return usage
+
+
+def invalidate_disk_usage():
+    global _usage_cache
+    _usage_cache = (0.0, None, None)
+
+
+def resolve_library_file(handler, query):
+    """Return the library text file named by query, or send an error response and return None."""
     if not SESSION["authenticated"]:
-        return json_response(
+        json_response(
             handler,
             {"error": "Unauthorized"},
             status=HTTPStatus.UNAUTHORIZED,
         )
+        return None
     params = parse_qs(query)
     requested = params.get("name", [""])[0]
     library_type = params.get("type", ["guides"])[0]
     
     if not requested:
-        return json_response(
+        json_response(
             handler,
             {"error": "File name is required."},
             status=HTTPStatus.BAD_REQUEST,
         )
+        return None
     library_dir = get_library_dir(library_type)
     if library_dir is None or not library_dir.exists():
-        return json_response(
+        json_response(
             handler,
             {"error": "Library directory not found."},
             status=HTTPStatus.NOT_FOUND,
         )
+        return None
     target = (library_dir / requested).resolve()
-    if library_dir not in target.parents:
-        return json_response(
+    # library_dir is resolved once at startup; commonpath compares the two
+    # normalized strings instead of walking every ancestor of target
+    library_root = str(library_dir)
+    try:
+        contained = os.path.commonpath([library_root, str(target)]) == library_root
+    except ValueError:  # Different drives on Windows
+        contained = False
+    if not contained:
+        json_response(
             handler,
             {"error": "Invalid file path."},
             status=HTTPStatus.BAD_REQUEST,
         )
-    if target.suffix.lower() != ".txt" or not target.exists():
-        return json_response(
+        return None
+    if target.suffix.lower() != ".txt" or not target.is_file():
+        json_response(
             handler,
             {"error": "File not found."},
             status=HTTPStatus.NOT_FOUND,
         )
+        return None
+    return target
+
+
+def handle_library_file(handler, query):
+    target = resolve_library_file(handler, query)
+    if target is None:
+        return None
     content = target.read_text(encoding="utf-8", errors="replace")
     return json_response(handler, {"name": target.name, "content": content})
 
 
+def handle_library_raw(handler, query):
+    """Send a library text file as-is, letting the kernel copy it to the socket."""
+    target = resolve_library_file(handler, query)
+    if target is None:
+        return None
+    with target.open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        handler.send_response(HTTPStatus.OK)
+        handler.send_header("Content-Type", "text/plain; charset=utf-8")
+        handler.send_header("Content-Length", str(size))
+        handler.end_headers()
+        # socket.sendfile uses os.sendfile where available and falls back to send()
+        handler.connection.sendfile(handle, 0, size)
+
+
 def build_model_payload():
     models = []
     for model in MODELS:
@@ -469,8 +790,18 @@ def build_model_payload():
     return models
 
 
+def build_status_payload():
+    return {
+        "ready": RELOAD_DONE.is_set(),
+        "loading": [
+            model["id"] for model in MODELS
+            if ENGINE.get_model_status(model["id"]) == "loading"
+        ],
+    }
+
+
 def build_session_payload():
-    with STATE_LOCK:
+    with EULA_LOCK:
         eula_accepted = bool(STATE.eula_accepted)
     if not SESSION["authenticated"]:
         return {
@@ -479,7 +810,7 @@ def build_session_payload():
             "must_change_password": False,
             "eula_accepted": eula_accepted,
         }
-    with STATE_LOCK:
+    with MUST_CHANGE_LOCK:
         must_change = STATE.must_change_password.get(SESSION["user"], True)
     return {
         "authenticated": True,
@@ -489,6 +820,24 @@ def build_session_payload():
     }
 
 
+def invalidate_session_payload():
+    global SESSION_GENERATION
+    SESSION_GENERATION = next(_session_generations)
+
+
+def session_payload_body():
+    """Return the encoded session payload, reusing it until the session or state changes."""
+    global _session_body_cache
+    # Read the generation before the state so a concurrent change can only
+    # make the cached entry stale, never mislabel it as current
+    generation = SESSION_GENERATION
+    cached_generation, body = _session_body_cache
+    if cached_generation != generation:
+        body = _json_dumps(build_session_payload())
+        _session_body_cache = (generation, body)
+    return body
+
+
 def handle_eula(handler):
     if EULA_PATH is None or not EULA_PATH.exists():
         return json_response(
@@ -504,9 +853,8 @@ def load_state(path):
     if not path.exists():
         return
     try:
-        with path.open("r", encoding="utf-8") as handle:
-            payload = json.load(handle)
-    except (json.JSONDecodeError, IOError) as e:
+        payload = _json_loads(path.read_bytes())
+    except (ValueError, OSError) as e:
         logger.warning("Could not load state file: %s. Using defaults.", e)
         return
     
@@ -516,31 +864,91 @@ def load_state(path):
     if "must_change_password" in payload:
         STATE.must_change_password = payload["must_change_password"]
     STATE.loaded_models = set(payload.get("loaded_models", []))
+    STATE.active_model = min(STATE.loaded_models, default=None)
     STATE.eula_accepted = bool(payload.get("eula_accepted", False))
     # Note: Don't sync to ENGINE yet - models will be reloaded on startup
 
 
 def save_state():
+    """Schedule a state write on the background writer thread."""
+    invalidate_session_payload()
+    STATE_DIRTY.set()
+
+
+def state_writer():
+    while True:
+        STATE_DIRTY.wait()
+        time.sleep(STATE_SAVE_DELAY)
+        STATE_DIRTY.clear()
+        try:
+            write_state()
+        except OSError:
+            logger.exception("Could not save state")
+
+
+def write_state():
+    """Write the current state to STATE_PATH immediately."""
+    global LAST_SAVED_STATE
+    invalidate_session_payload()
     if STATE_PATH is None:
         return
-    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with STATE_PATH.open("w", encoding="utf-8") as handle:
-        json.dump(STATE.to_payload(), handle, indent=2, sort_keys=True)
+    with SAVE_LOCK:
+        # Snapshot each field under its own lock, then write without them
+        state = STATE
+        with USERS_LOCK:
+            users = dict(state.users)
+        with MUST_CHANGE_LOCK:
+            must_change_password = dict(state.must_change_password)
+        with LOADED_MODELS_LOCK:
+            loaded_models = set(state.loaded_models)
+            active_model = state.active_model
+        with EULA_LOCK:
+            eula_accepted = state.eula_accepted
+        snapshot = RuntimeState(
+            users=users,
+            must_change_password=must_change_password,
+            loaded_models=loaded_models,
+            eula_accepted=eula_accepted,
+            active_model=active_model,
+        )
+        serialized = _json_dumps(snapshot.to_payload())
+        # Most saves (logins, repeated loads) change nothing; skip the rewrite
+        if serialized == LAST_SAVED_STATE and STATE_PATH.exists():
+            return
+        STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # Write a sibling file and swap it in so a crash mid-write can't
+        # leave a truncated state file behind
+        temp_path = STATE_PATH.with_suffix(".tmp")
+        with temp_path.open("wb") as handle:
+            handle.write(serialized)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, STATE_PATH)
+        LAST_SAVED_STATE = serialized
 
 
 def load_models(path):
-    if not path.exists():
+    # Parsed once per process; main() is the only caller
+    try:
+        payload = _json_loads(path.read_bytes())
+    except FileNotFoundError:
         return DEFAULT_MODELS.copy()
-    with path.open("r", encoding="utf-8") as handle:
-        payload = json.load(handle)
     models = payload.get("models", [])
     return models or DEFAULT_MODELS.copy()
 
 
+def set_models(models):
+    global MODELS, MODEL_BY_ID, MODEL_IDS
+    MODELS = models
+    MODEL_BY_ID = {model["id"]: model for model in models}
+    MODEL_IDS = frozenset(MODEL_BY_ID)
+
+
 def select_chat_model():
-    with STATE_LOCK:
-        if STATE.loaded_models:
-            return sorted(STATE.loaded_models)[0]
+    with LOADED_MODELS_LOCK:
+        active_model = STATE.active_model
+    if active_model is not None:
+        return active_model
     return next((model["id"] for model in MODELS if model.get("default")), "field-general")
 
 
@@ -580,7 +988,6 @@ def handle_save_chat(handler, payload):
     SAVED_CHATS_PATH.mkdir(parents=True, exist_ok=True)
     
     # Generate filename with timestamp
-    from datetime import datetime
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     filename = f"Chat_{timestamp}.txt"
     filepath = SAVED_CHATS_PATH / filename
@@ -609,11 +1016,9 @@ def handle_storage_info(handler):
             status=HTTPStatus.UNAUTHORIZED,
         )
     
-    import shutil
     try:
         # Get disk usage for the repository root
-        repo_root = Path(__file__).resolve().parents[2]
-        usage = shutil.disk_usage(repo_root)
+        usage = cached_disk_usage(REPO_ROOT)
         
         total_bytes = usage.total
         used_bytes = usage.used
@@ -647,6 +1052,104 @@ def handle_storage_info(handler):
         )
 
 
+class MultipartReader:
+    """Incremental multipart/form-data reader that never buffers a whole part."""
+
+    def __init__(self, stream, content_length, boundary, chunk_size=65536):
+        self.stream = stream
+        self.remaining = content_length
+        self.delimiter = b"--" + boundary.encode("latin-1")
+        self.buffer = bytearray()
+        # Socket reads land in one reusable chunk rather than a new bytes each time
+        self.chunk = memoryview(bytearray(chunk_size))
+
+    def _fill(self):
+        """Read the next chunk of the body into the buffer; False once the body is exhausted."""
+        if self.remaining <= 0:
+            return False
+        count = self.stream.readinto(self.chunk[:min(len(self.chunk), self.remaining)])
+        if not count:
+            self.remaining = 0
+            return False
+        self.remaining -= count
+        self.buffer += self.chunk[:count]
+        return True
+
+    def _write_prefix(self, output, length):
+        """Write the first length buffered bytes to output without copying them, then drop them."""
+        with memoryview(self.buffer) as view, view[:length] as prefix:
+            output.write(prefix)
+        del self.buffer[:length]
+
+    def _skip_to_delimiter(self):
+        keep = len(self.delimiter) - 1
+        while True:
+            index = self.buffer.find(self.delimiter)
+            if index != -1:
+                del self.buffer[:index + len(self.delimiter)]
+                return True
+            if len(self.buffer) > keep:
+                del self.buffer[:len(self.buffer) - keep]
+            if not self._fill():
+                return False
+
+    def next_file_part(self):
+        """Advance to the next part carrying a filename and return the filename, or None."""
+        while self._skip_to_delimiter():
+            while len(self.buffer) < 2:
+                if not self._fill():
+                    return None
+            if self.buffer.startswith(b"--"):
+                return None  # Closing delimiter
+            # Headers end with \r\n\r\n; only rescan what the last fill added
+            searched = 0
+            while True:
+                header_end = self.buffer.find(b"\r\n\r\n", searched)
+                if header_end != -1:
+                    break
+                if len(self.buffer) > 16384:
+                    return None
+                searched = max(0, len(self.buffer) - 3)
+                if not self._fill():
+                    return None
+            # Only the small header block of a file part is ever copied out
+            is_file = self.buffer.find(b"filename=", 0, header_end) != -1
+            headers = bytes(self.buffer[:header_end]) if is_file else b""
+            del self.buffer[:header_end + 4]
+            if is_file and b"Content-Disposition" in headers:
+                filename_match = _FILENAME_RE.search(headers)
+                if not filename_match:
+                    return None
+                return filename_match.group(1).decode("utf-8", errors="replace")
+        return None
+
+    def copy_part_to(self, output):
+        """Write the current part's data to output and return the number of bytes written."""
+        marker = b"\r\n" + self.delimiter
+        keep = len(marker) - 1
+        written = 0
+        while True:
+            index = self.buffer.find(marker)
+            if index != -1:
+                self._write_prefix(output, index)
+                written += index
+                # Leave the delimiter in place for the next part
+                del self.buffer[:2]
+                return written
+            if len(self.buffer) > keep:
+                flush = len(self.buffer) - keep
+                self._write_prefix(output, flush)
+                written += flush
+            if not self._fill():
+                raise ValueError("Upload ended before the file was complete.")
+
+    def discard_rest(self):
+        """Read and drop the rest of the body so the connection can serve another request."""
+        self.buffer.clear()
+        while self._fill():
+            self.buffer.clear()
+
+
 def handle_file_upload(handler):
     """Handle file upload to Personal Files directory."""
     logger.debug("Upload request received")
@@ -669,9 +1172,6 @@ def handle_file_upload(handler):
     
     PERSONAL_FILES_PATH.mkdir(parents=True, exist_ok=True)
     
-    import shutil
-    import re
-    
     content_type = handler.headers.get('Content-Type', '')
     logger.debug("Content-Type: %s", content_type)
     
@@ -683,9 +1183,10 @@ def handle_file_upload(handler):
             status=HTTPStatus.BAD_REQUEST,
         )
     
+    temp_path = None
     try:
         # Extract boundary from Content-Type header
-        boundary_match = re.search(r'boundary=([^;]+)', content_type)
+        boundary_match = _BOUNDARY_RE.search(content_type)
         if not boundary_match:
             logger.debug("No boundary found")
             return json_response(
@@ -696,61 +1197,30 @@ def handle_file_upload(handler):
         
         boundary = boundary_match.group(1).strip('"')
         logger.debug("Boundary: %s", boundary)
-        boundary_bytes = ('--' + boundary).encode()
         
-        # Read the entire request body
-        content_length = int(handler.headers.get('Content-Length', 0))
+        content_length = parse_content_length(handler)
         logger.debug("Content-Length: %s", content_length)
-        body = handler.rfile.read(content_length)
-        logger.debug("Read %s bytes", len(body))
         
-        # Split by boundary
-        parts = body.split(boundary_bytes)
-        logger.debug("Found %s parts", len(parts))
-        
-        filename = None
-        file_data = None
-        
-        # Parse parts to find the file
-        for i, part in enumerate(parts):
-            logger.debug("Processing part %s, length %s", i, len(part))
-            if b'Content-Disposition' in part and b'filename=' in part:
-                logger.debug("Found file part")
-                # Extract filename
-                filename_match = re.search(rb'filename="([^"]+)"', part)
-                if filename_match:
-                    filename = filename_match.group(1).decode('utf-8', errors='replace')
-                    logger.debug("Filename: %s", filename)
-                
-                # Extract file data (everything after the headers)
-                # Headers end with \r\n\r\n
-                header_end = part.find(b'\r\n\r\n')
-                if header_end != -1:
-                    file_data = part[header_end + 4:]
-                    # Remove trailing \r\n if present
-                    if file_data.endswith(b'\r\n'):
-                        file_data = file_data[:-2]
-                    logger.debug("File data length: %s", len(file_data))
-                break
-        
-        if not filename or file_data is None:
-            logger.debug("No file found in request")
+        if content_length is None:
             return json_response(
                 handler,
-                {"error": "No file provided or invalid form data."},
+                {"error": "Invalid Content-Length."},
                 status=HTTPStatus.BAD_REQUEST,
             )
+        if content_length > MAX_UPLOAD:
+            limit_mb = MAX_UPLOAD / (1024 ** 2)
+            return json_response(
+                handler,
+                {"error": f"File too large. Uploads are limited to {limit_mb:.0f} MB."},
+                status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            )
         
-        file_size = len(file_data)
-        logger.debug("File size: %s bytes", file_size)
-        
-        # Check disk space
-        repo_root = Path(__file__).resolve().parents[2]
-        usage = shutil.disk_usage(repo_root)
+        # Check disk space before reading anything; the body size bounds the file size
+        usage = cached_disk_usage(REPO_ROOT)
         free_bytes = usage.free
         
-        # Calculate required space (file size + 15% reserved)
-        required_bytes = file_size * 1.15
+        # Calculate required space (upload size + 15% reserved)
+        required_bytes = content_length * 1.15
         logger.debug("Required: %s, Available: %s", required_bytes, free_bytes)
         
         if required_bytes > free_bytes:
@@ -763,8 +1233,20 @@ def handle_file_upload(handler):
                 status=HTTPStatus.INSUFFICIENT_STORAGE,
             )
         
+        # Stream the body instead of reading it into memory
+        reader = MultipartReader(handler.rfile, content_length, boundary)
+        filename = reader.next_file_part()
+        logger.debug("Filename: %s", filename)
+        
+        if not filename:
+            logger.debug("No file found in request")
+            return json_response(
+                handler,
+                {"error": "No file provided or invalid form data."},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+        
         # Sanitize filename
-        import os
         filename = os.path.basename(filename)
         logger.debug("Sanitized filename: %s", filename)
         
@@ -776,7 +1258,6 @@ def handle_file_upload(handler):
                 status=HTTPStatus.BAD_REQUEST,
             )
         
-        # Save file
         filepath = PERSONAL_FILES_PATH / filename
         logger.debug("Filepath: %s", filepath)
         
@@ -789,8 +1270,25 @@ def handle_file_upload(handler):
                 status=HTTPStatus.CONFLICT,
             )
         
-        with filepath.open('wb') as f:
-            f.write(file_data)
+        # Write to a hidden temporary file and move it into place once complete.
+        # Created with 0o666 so the umask applies as it would to a plain open();
+        # tempfile would make every upload owner-only
+        temp_path = PERSONAL_FILES_PATH / f"{UPLOAD_TEMP_PREFIX}{secrets.token_hex(8)}"
+        fd = os.open(
+            temp_path,
+            os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0),
+            0o666,
+        )
+        with os.fdopen(fd, "wb") as f:
+            file_size = reader.copy_part_to(f)
+        logger.debug("File size: %s bytes", file_size)
+        # The closing delimiter and any later form fields are still unread on
+        # this keep-alive connection and would be parsed as the next request
+        reader.discard_rest()
+        
+        temp_path.replace(filepath)
+        temp_path = None
+        invalidate_disk_usage()
         
         logger.info("File saved successfully: %s", filepath)
         return json_response(handler, {"success": True, "filename": filename})
@@ -802,6 +1300,9 @@ def handle_file_upload(handler):
             {"error": f"Upload failed: {str(e)}"},
             status=HTTPStatus.INTERNAL_SERVER_ERROR,
         )
+    finally:
+        if temp_path is not None:
+            temp_path.unlink(missing_ok=True)
 
 
 def handle_reset_password(handler):
@@ -814,14 +1315,16 @@ def handle_reset_password(handler):
         )
     
     # Reset password to default
-    with STATE_LOCK:
-        STATE.users[DEFAULT_USERNAME] = hash_password(DEFAULT_PASSWORD)
+    with USERS_LOCK:
+        STATE.users[DEFAULT_USERNAME] = default_password_hash()
+    with MUST_CHANGE_LOCK:
         STATE.must_change_password[DEFAULT_USERNAME] = True
-        save_state()
+    write_state()
     
     # Reset session
     SESSION["authenticated"] = False
     SESSION["user"] = None
+    invalidate_session_payload()
     
     return json_response(handler, {"success": True, "message": "Password reset."})
 
@@ -838,7 +1341,6 @@ def handle_reset_to_defaults(handler):
     # Delete all saved chats
     if SAVED_CHATS_PATH and SAVED_CHATS_PATH.exists():
         try:
-            import shutil
             for item in SAVED_CHATS_PATH.iterdir():
                 if item.is_file():
                     item.unlink()
@@ -850,7 +1352,6 @@ def handle_reset_to_defaults(handler):
     # Delete all personal files
     if PERSONAL_FILES_PATH and PERSONAL_FILES_PATH.exists():
         try:
-            import shutil
             for item in PERSONAL_FILES_PATH.iterdir():
                 if item.is_file():
                     item.unlink()
@@ -858,6 +1359,7 @@ def handle_reset_to_defaults(handler):
                     shutil.rmtree(item)
         except Exception as e:
             logger.error("Error cleaning personal files: %s", e)
+    invalidate_disk_usage()
     
     # Delete state file to reset to defaults
     if STATE_PATH and STATE_PATH.exists():
@@ -871,15 +1373,10 @@ def handle_reset_to_defaults(handler):
     SESSION["user"] = None
     
     # Reset in-memory state
-    with STATE_LOCK:
-        global STATE
-        STATE = RuntimeState(
-            users={DEFAULT_USERNAME: hash_password(DEFAULT_PASSWORD)},
-            must_change_password={DEFAULT_USERNAME: True},
-            loaded_models=set(),
-            eula_accepted=False,
-        )
-        save_state()
+    global STATE
+    STATE = default_state()
+    # Persist synchronously so the reset is durable before we respond
+    write_state()
     
     return json_response(handler, {"success": True, "message": "All settings and files reset."})
 
@@ -905,24 +1402,83 @@ def handle_reset(handler):
     SESSION["user"] = None
     
     # Reset in-memory state
-    with STATE_LOCK:
-        global STATE
-        STATE = RuntimeState(
-            users={DEFAULT_USERNAME: hash_password(DEFAULT_PASSWORD)},
-            must_change_password={DEFAULT_USERNAME: True},
-            loaded_models=set(),
-            eula_accepted=False,
-        )
-        save_state()
+    global STATE
+    STATE = default_state()
+    # Persist synchronously so the reset is durable before we respond
+    write_state()
     
     return json_response(handler, {"success": True, "message": "Settings reset. Server restarting..."})
 
 
+def create_server(args, handler):
+    if args.bind_fd is None:
+        return LlmBoxServer(("", args.port), handler)
+    # The launcher bound the port and kept it open across our start-up, so
+    # nothing else can claim it in between; adopt that socket as-is
+    server = LlmBoxServer(("", args.port), handler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = socket.socket(fileno=args.bind_fd)
+    server.server_address = server.socket.getsockname()
+    return server
+
+
+def handle_sigterm(signum, frame):
+    # Unwind serve_forever the same way Ctrl+C does so main() flushes state
+    raise SystemExit(0)
+
+
+def reload_models(model_ids):
+    """Reload the models that were loaded before the last shutdown."""
+    try:
+        if not model_ids:
+            return
+        logger.info("%s", "=" * 60)
+        logger.info("Reloading %s model(s) from previous session...", len(model_ids))
+        logger.info("%s", "=" * 60)
+        # Start every load first so they overlap on the engine's loader pool,
+        # then record each one as it finishes
+        futures = {}
+        for model_id in model_ids:
+            model = MODEL_BY_ID.get(model_id)
+            if model:
+                logger.info("Loading %s...", model.get("name", model_id))
+                futures[ENGINE.load_model(model_id)] = model
+            else:
+                logger.warning("⚠ Skipping unknown model: %s", model_id)
+        for future in as_completed(futures):
+            model = futures[future]
+            model_id = model["id"]
+            try:
+                future.result()
+            except Exception as e:
+                logger.error("✗ Failed to reload %s: %s", model_id, e)
+                continue
+            with LOADED_MODELS_LOCK:
+                STATE.loaded_models.add(model_id)  # Only add if load succeeds
+                if STATE.active_model is None or model_id < STATE.active_model:
+                    STATE.active_model = model_id
+            logger.info("✓ %s loaded successfully", model.get("name", model_id))
+        
+        # Save updated state with only successfully loaded models
+        save_state()
+        with LOADED_MODELS_LOCK:
+            loaded = sorted(STATE.loaded_models)
+        if loaded:
+            logger.info("Models loaded: %s", ", ".join(loaded))
+        logger.info("%s", "=" * 60)
+    finally:
+        RELOAD_DONE.set()
+
+
 def main():
-    repo_root = Path(__file__).resolve().parents[2]
-    
     parser = argparse.ArgumentParser(description="LLM in a Box local server")
     parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--bind-fd",
+        type=int,
+        default=None,
+        help="Listen on an already bound and listening socket inherited from the launcher",
+    )
     parser.add_argument(
         "--static-dir",
         default="app/frontend",
@@ -945,63 +1501,61 @@ def main():
     )
     args = parser.parse_args()
 
-    global STATE_PATH
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    global STATE, STATE_PATH
+    STATE = default_state()
     STATE_PATH = Path(args.data_dir) / "state.json"
-    with STATE_LOCK:
-        load_state(STATE_PATH)
-        save_state()
+    load_state(STATE_PATH)
+    write_state()
+    Thread(target=state_writer, name="state-writer", daemon=True).start()
 
-    global MODELS
-    MODELS = load_models(Path(args.models_config))
+    set_models(load_models(Path(args.models_config)))
     ENGINE.set_model_catalog(MODELS)
 
-    # Reload models that were previously loaded before shutdown
-    if STATE.loaded_models:
-        models_to_reload = STATE.loaded_models.copy()
-        STATE.loaded_models.clear()  # Clear and repopulate based on actual load results
-        
-        logger.info("%s", "=" * 60)
-        logger.info("Reloading %s model(s) from previous session...", len(models_to_reload))
-        logger.info("%s", "=" * 60)
-        for model_id in models_to_reload:
-            model = next((m for m in MODELS if m.get("id") == model_id), None)
-            if model:
-                logger.info("Loading %s...", model.get("name", model_id))
-                try:
-                    ENGINE.load_model(model_id)
-                    STATE.loaded_models.add(model_id)  # Only add if load succeeds
-                    logger.info("✓ %s loaded successfully", model.get("name", model_id))
-                except Exception as e:
-                    logger.error("✗ Failed to reload %s: %s", model_id, e)
-            else:
-                logger.warning("⚠ Skipping unknown model: %s", model_id)
-        
-        # Save updated state with only successfully loaded models
-        with STATE_LOCK:
-            save_state()
-        logger.info("%s", "=" * 60)
-
     global LIBRARY_PATH, SAVED_CHATS_PATH, PERSONAL_FILES_PATH, EULA_PATH
     LIBRARY_PATH = Path(args.library_dir).resolve()
-    SAVED_CHATS_PATH = (repo_root / "Saved Chats").resolve()
+    SAVED_CHATS_PATH = (REPO_ROOT / "Saved Chats").resolve()
     SAVED_CHATS_PATH.mkdir(parents=True, exist_ok=True)
-    PERSONAL_FILES_PATH = (repo_root / "Personal Files").resolve()
+    PERSONAL_FILES_PATH = (REPO_ROOT / "Personal Files").resolve()
     PERSONAL_FILES_PATH.mkdir(parents=True, exist_ok=True)
-    EULA_PATH = (repo_root / "EULA.txt").resolve()
+    EULA_PATH = (REPO_ROOT / "EULA.txt").resolve()
+
+    # Models that were loaded before shutdown; repopulated as reloads succeed.
+    # The saved active model is picked again from the ones that come back
+    with LOADED_MODELS_LOCK:
+        models_to_reload = STATE.loaded_models.copy()
+        STATE.loaded_models.clear()
+        STATE.active_model = None
 
     handler = lambda *handler_args, **handler_kwargs: LlmBoxHandler(
         *handler_args, directory=args.static_dir, **handler_kwargs
     )
 
-    with ThreadingTCPServer(("", args.port), handler) as server:
+    # Bind and start answering before reloading models so the UI comes up
+    # right away; /api/status reports when the reload has finished
+    with create_server(args, handler) as server:
+        Thread(
+            target=reload_models,
+            args=(models_to_reload,),
+            name="model-reload",
+            daemon=True,
+        ).start()
+
         url = f"http://127.0.0.1:{args.port}"
-        logger.info("\n%s\n#%s#\n#%s#\n#%s#\n#%s#\n%s\n", "#" * 60, " " * 58, "  LLM-in-a-Box is READY!".center(58), f"  {url}".center(58), " " * 58, "#" * 60)
+        logger.info(READY_BANNER, f"  {url}".center(58))
         
-        if STATE.loaded_models:
-            logger.info("Models loaded: %s", ", ".join(STATE.loaded_models))
-        
-        server.serve_forever()
-
+        # The launcher watches stdout for this line to know we're accepting
+        print(READY_SENTINEL, flush=True)
+        try:
+            server.serve_forever()
+        finally:
+            # Don't lose a change still waiting for the background writer.
+            # SAVE_LOCK makes this wait out a write already in progress, and
+            # an unchanged state is not rewritten
+            write_state()
+            ENGINE.shutdown()
+            ENGINE.close()
 
 if __name__ == "__main__":
     main()
@@ -1,15 +1,19 @@
 #!/usr/bin/env python3
 import argparse
 import os
+import signal
 import socket
 import subprocess
 import sys
+import threading
 import time
-import urllib.error
-import urllib.request
 import webbrowser
 from pathlib import Path
 
+# Printed by the server once it is accepting connections
+READY_SENTINEL = "LLMBOX_READY"
+READY_TIMEOUT = 60.0
+
 
 def _pick_free_port() -> int:
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
@@ -17,11 +21,32 @@ def _pick_free_port() -> int:
         return sock.getsockname()[1]
 
 
+def _bind_listener(port: int) -> socket.socket:
+    """Bind and listen on the server port so it can be handed to the server as-is."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("", port))
+        sock.listen(128)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
 def _repo_root() -> Path:
+    # An installer can pin the locations up front and skip the lookups below
+    override = os.environ.get("LLMBOX_REPO_ROOT")
+    if override:
+        return Path(override)
     return Path(__file__).resolve().parents[2]
 
 
 def _find_python(repo_root: Path) -> str:
+    override = os.environ.get("LLMBOX_PYTHON")
+    if override:
+        return override
+
     candidates = []
     if os.name == "nt":
         candidates.append(repo_root / "python" / "python.exe")
@@ -59,6 +84,25 @@ def _build_server_args(repo_root: Path, port: int) -> list[str]:
     ]
 
 
+def _relay_output(stream, ready: threading.Event) -> None:
+    """Copy the server's stdout to ours, flagging ready when the sentinel appears."""
+    for raw_line in iter(stream.readline, b""):
+        line = raw_line.decode("utf-8", errors="replace")
+        if line.strip() == READY_SENTINEL:
+            ready.set()
+            continue
+        try:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+        except (OSError, ValueError):
+            pass  # Keep draining the pipe even if our own stdout is gone
+    stream.close()
+
+
+def _interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="LLM in a Box launcher")
     parser.add_argument("--port", type=int, default=None)
@@ -68,46 +112,104 @@ def main() -> int:
     repo_root = _repo_root()
     python_exe = _find_python(repo_root)
 
-    port = args.port
-    if port is None:
+    # On POSIX, bind the port here and pass the listening socket down, so it
+    # can't be taken between choosing it and the server starting to listen.
+    # Windows can't inherit sockets this way; the server binds it itself there
+    listener = None
+    if os.name != "nt":
         try:
-            port = _pick_free_port()
+            listener = _bind_listener(args.port or 0)
         except OSError:
-            port = 8000
+            listener = None
 
-    server_args = [python_exe, *_build_server_args(repo_root, port)]
+    if listener is not None:
+        port = listener.getsockname()[1]
+    else:
+        port = args.port
+        if port is None:
+            try:
+                port = _pick_free_port()
+            except OSError:
+                port = 8000
+
+    # -I keeps the user's site-packages and PYTHON* variables from changing
+    # what the server imports, -u stops its output sitting in a pipe buffer,
+    # and UTF-8 mode keeps log lines intact through the pipe on any console
+    # code page (PYTHONIOENCODING would be ignored under -I)
+    server_args = [
+        python_exe,
+        "-I",
+        "-u",
+        "-X",
+        "utf8",
+        *_build_server_args(repo_root, port),
+    ]
+    pass_fds = ()
+    if listener is not None:
+        server_args.extend(["--bind-fd", str(listener.fileno())])
+        pass_fds = (listener.fileno(),)
 
     url = f"http://127.0.0.1:{port}"
     print("LLM-in-a-Box launcher")
     print(f"Server URL: {url}")
 
-    proc = subprocess.Popen(server_args, cwd=str(repo_root))
-
-    if not args.no_browser:
-        ready = False
-        for _ in range(40):
-            if proc.poll() is not None:
-                break
-            try:
-                urllib.request.urlopen(f"{url}/api/session", timeout=1)
-                ready = True
-                break
-            except (urllib.error.URLError, ValueError):
-                time.sleep(0.25)
-
-        if not ready:
-            time.sleep(0.5)
-        webbrowser.open(url, new=2)
-
+    # Being asked to stop (closing the console window, kill, logout) goes
+    # through the same shutdown as Ctrl+C. The server runs in its own session
+    # and never sees these signals, so install the handlers before starting it
+    for signal_name in ("SIGTERM", "SIGHUP", "SIGBREAK"):
+        if hasattr(signal, signal_name):
+            signal.signal(getattr(signal, signal_name), _interrupt)
+
+    # The server's output is piped through us so we can spot its ready line;
+    # replace whatever our own console can't display rather than failing
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(errors="replace")
+    proc = subprocess.Popen(
+        server_args,
+        cwd=str(repo_root),
+        stdout=subprocess.PIPE,
+        close_fds=True,
+        pass_fds=pass_fds,
+        # Keep terminal signals away from the server; we stop it ourselves
+        start_new_session=os.name != "nt",
+    )
     try:
+        if listener is not None:
+            listener.close()  # The server holds its own copy now
+        ready_event = threading.Event()
+        threading.Thread(
+            target=_relay_output,
+            args=(proc.stdout, ready_event),
+            name="server-output",
+            daemon=True,
+        ).start()
+
+        if not args.no_browser:
+            deadline = time.monotonic() + READY_TIMEOUT
+            ready = False
+            while time.monotonic() < deadline:
+                if ready_event.wait(0.25):
+                    ready = True
+                    break
+                if proc.poll() is not None:
+                    break
+
+            if not ready:
+                time.sleep(0.5)
+            webbrowser.open(url, new=2)
+
         proc.wait()
     except KeyboardInterrupt:
-        proc.terminate()
-        try:
-            proc.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            proc.kill()
-            proc.wait(timeout=5)
+        pass
+    finally:
+        # However we got here, don't leave the server holding the port
+        if proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait(timeout=5)
 
     return proc.returncode or 0
 